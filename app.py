@@ -1,9 +1,16 @@
 # app.py - Zara Clothing Sales Dashboard (Works with Full Dataset)
+from concurrent.futures import ThreadPoolExecutor
+
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
 from io import StringIO
 
+from charts import merge_bar_traces, show_table_page
+from data import load_zara, to_csv_bytes
+from filters import filter_frame, filter_options, make_filter_key
+
 # -------------------------- Page Setup --------------------------
 st.set_page_config(page_title="Zara Sales Dashboard", layout="wide", initial_sidebar_state="expanded")
 st.title("Zara Clothing Sales Dashboard")
@@ -13,102 +20,21 @@ st.title("Zara Clothing Sales Dashboard")
 
 
 # -------------------------- Data Loading --------------------------
-# Try to load the real dataset first (works locally + when deployed with the file)
-try:
-    # This works when salesdata.csv is in the same folder
-    df = pd.read_csv("./Business_sales_EDA.csv", sep=None, engine="python")
-    data_source = "./Business_sales_EDA.csv"
-except FileNotFoundError:
-    # Fallback: let user upload the file (useful when testing online without the CSV yet)
-    st.warning("salesdata.csv not found in project folder → please upload it below")
-    uploaded = st.file_uploader("./Business_sales_EDA.csv", type=["csv"])
-    if uploaded is not None:
-        df = pd.read_csv(uploaded, sep=None, engine="python")
-        data_source = "uploaded file"
-    else:
-        st.info("Waiting for salesdata.csv upload...")
-        st.stop()
-else:
-    st.success(f"Loaded {len(df):,} rows from {data_source}")
-
-
-
-
-# -------------------------- Data Cleaning --------------------------
-# Make a copy to avoid warnings
-df = df.copy()
-
-# Standardize common column names (case-insensitive match)
-df.columns = df.columns.str.strip()
-col_map = {
-    'product_name': 'name',
-    'productname': 'name',
-    'item': 'name',
-    'price': 'price',
-    'sales_volume': 'Sales Volume',
-    'salesvolume': 'Sales Volume',
-    'units_sold': 'Sales Volume',
-    'unitssold': 'Sales Volume',
-    'quantity': 'Sales Volume',
-    'revenue': 'Revenue',
-    'promotion': 'Promotion',
-    'product_position': 'Product Position',
-    'position': 'Product Position',
-    'seasonal': 'Seasonal',
-    'section': 'section',
-    'gender': 'section',
-    'season': 'season',
-    'material': 'material',
-    'fabric': 'material'
-}
-
-for old, new in col_map.items():
-    for col in df.columns:
-        if col.lower() == old:
-            df.rename(columns={col: new}, inplace=True)
-
-# Convert price and sales volume
-df['price'] = pd.to_numeric(df['price'], errors='coerce')
-if 'Sales Volume' not in df.columns:
-    possible_sales_cols = ['units_sold', 'quantity', 'sales_volume', 'sales', 'units']
-    for col in possible_sales_cols:
-        if col in df.columns.str.lower():
-            df['Sales Volume'] = pd.to_numeric(df[df.columns[df.columns.str.lower() == col].iloc[0]], errors='coerce')
-            break
-
-df['Sales Volume'] = pd.to_numeric(df.get('Sales Volume', 0), errors='coerce')
-
-# Drop rows with no price or sales (critical)
-df.dropna(subset=['price', 'Sales Volume'], inplace=True)
-
-# Calculate Revenue
-df['Revenue'] = df['price'] * df['Sales Volume']
-
-# Fill missing categorical values
-cat_cols = ['Promotion', 'Product Position', 'Seasonal', 'section', 'season', 'material', 'name']
-for col in cat_cols:
-    if col in df.columns:
-        df[col] = df[col].fillna("Unknown").astype(str)
-    else:
-        df[col] = "Unknown"
+df, data_id = load_zara()
+
+FILTER_COLS = ['Promotion', 'Product Position', 'Seasonal', 'section', 'season', 'material']
 
-# Ensure 'name' exists
-if 'name' not in df.columns:
-    df['name'] = df.get('product_name', 'Product ' + df.index.astype(str))
 
 # -------------------------- Sidebar Filters --------------------------
 st.sidebar.header("Filters")
 
-# Get unique values safely
-def get_unique(col):
-    return sorted([x for x in df[col].unique() if pd.notna(x)])
-
-promotion_opts = get_unique('Promotion')
-position_opts = get_unique('Product Position')
-seasonal_opts = get_unique('Seasonal')
-section_opts = get_unique('section')
-season_opts = get_unique('season')
-material_opts = get_unique('material')
+opts = filter_options(df, data_id, tuple(FILTER_COLS))
+promotion_opts = opts['Promotion']
+position_opts = opts['Product Position']
+seasonal_opts = opts['Seasonal']
+section_opts = opts['section']
+season_opts = opts['season']
+material_opts = opts['material']
 
 promotion = st.sidebar.multiselect("Promotion", options=promotion_opts, default=promotion_opts)
 position = st.sidebar.multiselect("Product Position", options=position_opts, default=position_opts)
@@ -128,15 +54,9 @@ price_range = st.sidebar.slider(
 )
 
 # Apply all filters
-filtered_df = df[
-    (df['Promotion'].isin(promotion)) &
-    (df['Product Position'].isin(position)) &
-    (df['Seasonal'].isin(seasonal)) &
-    (df['section'].isin(section)) &
-    (df['season'].isin(season)) &
-    (df['material'].isin(material)) &
-    (df['price'].between(price_range[0], price_range[1]))
-].copy()
+selections = {'Promotion': promotion, 'Product Position': position, 'Seasonal': seasonal,
+              'section': section, 'season': season, 'material': material}
+filtered_df = filter_frame(df, selections, price_range)
 
 # -------------------------- Dashboard Metrics --------------------------
 st.markdown("## Key Metrics")
@@ -148,21 +68,83 @@ c4.metric("Average Price", f"${filtered_df['price'].mean():.2f}")
 
 st.markdown("---")
 
+# -------------------------- Aggregations --------------------------
+# Identical sidebar selections replay cached aggregates
+key = make_filter_key(selections, price_range)
+
+
+def position_season_totals(frame):
+    """Units by position and revenue by season from one bincount over the joint codes.
+
+    Both are marginals of the (position, season) grid; slot 0 on each axis holds
+    missing codes (-1).
+    """
+    pos_cats = frame['Product Position'].cat.categories
+    season_cats = frame['season'].cat.categories
+    grid_shape = (len(pos_cats) + 1, len(season_cats) + 1)
+    joint = ((frame['Product Position'].cat.codes.values.astype(np.intp) + 1) * grid_shape[1]
+             + frame['season'].cat.codes.values + 1)
+    grid_size = grid_shape[0] * grid_shape[1]
+    counts = np.bincount(joint, minlength=grid_size).reshape(grid_shape)
+    units = np.bincount(joint, weights=frame['Sales Volume'].values, minlength=grid_size).reshape(grid_shape)
+    revenue = np.bincount(joint, weights=frame['Revenue'].values, minlength=grid_size).reshape(grid_shape)
+
+    present = counts[1:].sum(axis=1) > 0
+    pos_units = units[1:].sum(axis=1)[present]
+    # bincount always returns float sums; restore ints only when the units were ints
+    if frame['Sales Volume'].dtype.kind in 'iu':
+        pos_units = pos_units.astype(np.int64)
+    pos_data = pd.Series(pos_units, index=pos_cats[present]).sort_values(ascending=False)
+    present = counts[:, 1:].sum(axis=0) > 0
+    season_data = pd.Series(revenue[:, 1:].sum(axis=0)[present], index=season_cats[present])
+    return pos_data, season_data
+
+
+# The origin chart covers the whole dataset, so it only depends on data_id
+@st.cache_data(show_spinner=False, max_entries=1)
+def origin_totals(_df, data_id: str):
+    return _df.groupby('origin', observed=True)['Sales Volume'].sum().sort_values(ascending=False).reset_index()
+
+
+# Only data_id and filter_key are hashed; the filtered frame follows from them
+@st.cache_data(show_spinner=False, max_entries=32)
+def compute_aggregates(_filtered_df, data_id: str, filter_key: tuple) -> dict:
+    # The aggregations are independent and NumPy/pandas release the GIL inside
+    # their reduction kernels, so run them side by side
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        grid = ex.submit(position_season_totals, _filtered_df)
+        top10 = ex.submit(_filtered_df.nlargest, 10, 'Sales Volume')
+    pos_data, season_data = grid.result()
+
+    return {
+        'pos_data': pos_data,
+        'season_data': season_data,
+        'top10': top10.result(),
+    }
+
+
+aggregates = compute_aggregates(filtered_df, data_id, key)
+pos_data = aggregates['pos_data']
+season_data = aggregates['season_data']
+top10 = aggregates['top10']
+origin_sales = origin_totals(df, data_id)
+
 # -------------------------- Charts --------------------------
+MAX_SCATTER_POINTS = 5000
+
 col1, col2 = st.columns(2)
 
 with col1:
     st.subheader("Sales Volume by Product Position")
-    pos_data = filtered_df.groupby('Product Position')['Sales Volume'].sum().sort_values(ascending=False)
     fig1 = px.bar(x=pos_data.index, y=pos_data.values, text=pos_data.values,
                   color=pos_data.index, labels={'x': 'Position', 'y': 'Units Sold'})
+    fig1 = merge_bar_traces(fig1)
     fig1.update_traces(textposition='outside')
     fig1.update_layout(showlegend=False)
     st.plotly_chart(fig1, use_container_width=True)
 
 with col2:
     st.subheader("Revenue Share by Season")
-    season_data = filtered_df.groupby('season')['Revenue'].sum()
     if not season_data.empty:
         fig2 = px.pie(values=season_data.values, names=season_data.index,
                       color_discrete_sequence=px.colors.sequential.Plasma)
@@ -174,7 +156,6 @@ col1, col2 = st.columns(2)
 
 with col1:
     st.subheader("Top 10 Best-Selling Products")
-    top10 = filtered_df.nlargest(10, 'Sales Volume')
     fig3 = px.bar(top10, x='name', y='Sales Volume', color='price',
                   text='Sales Volume', hover_data=['section', 'Promotion'])
     fig3.update_xaxes(tickangle=45)
@@ -183,10 +164,22 @@ with col1:
 
 with col2:
     st.subheader("Price vs Sales Volume (Size = Revenue)")
-    fig4 = px.scatter(filtered_df, x='price', y='Sales Volume',
-                      size='Revenue', color='Promotion',
-                      hover_name='name', hover_data=['section', 'season', 'material'],
-                      size_max=60)
+    if len(filtered_df) <= MAX_SCATTER_POINTS:
+        # Few enough rows to ship every point; WebGL avoids one SVG node per bubble
+        fig4 = px.scatter(filtered_df, x='price', y='Sales Volume',
+                          size='Revenue', color='Promotion',
+                          hover_name='name', hover_data=['section', 'season', 'material'],
+                          size_max=20, render_mode='webgl')
+    else:
+        # Past this point bubbles just overdraw each other - bin server-side so the
+        # payload scales with the grid, not the row count
+        revenue, x_edges, y_edges = np.histogram2d(
+            filtered_df['price'].values, filtered_df['Sales Volume'].values,
+            bins=60, weights=filtered_df['Revenue'].values)
+        fig4 = px.imshow(revenue.T, origin='lower', aspect='auto',
+                         x=(x_edges[:-1] + x_edges[1:]) / 2, y=(y_edges[:-1] + y_edges[1:]) / 2,
+                         labels={'color': 'Revenue'}, color_continuous_scale='Plasma')
+        st.caption(f"{len(filtered_df):,} products binned by price and units sold (color = total revenue)")
     fig4.update_layout(xaxis_title="Price ($)", yaxis_title="Units Sold")
     st.plotly_chart(fig4, use_container_width=True)
 
@@ -195,10 +188,10 @@ st.markdown("---")
 
 # -------------------------- GRAPH: Origin Country Performance --------------------------
 st.subheader("Which Countries Produce the Best Sellers?")
-origin_sales = df.groupby('origin')['Sales Volume'].sum().sort_values(ascending=False).reset_index()
 fig4 = px.bar(origin_sales, x='origin', y='Sales Volume',
               color='origin', text='Sales Volume',
               title="Sales Volume by Country of Origin")
+fig4 = merge_bar_traces(fig4)
 fig4.update_traces(textposition='outside')
 st.plotly_chart(fig4, use_container_width=True)
 
@@ -206,11 +199,12 @@ st.plotly_chart(fig4, use_container_width=True)
 # -------------------------- Data Table & Export --------------------------
 st.markdown("---")
 st.subheader(f"Filtered Data Table ({len(filtered_df):,} rows)")
-st.dataframe(filtered_df.reset_index(drop=True), use_container_width=True, height=400)
+# Only ship one page of rows to the browser; the download below has everything
+show_table_page(filtered_df, use_container_width=True, height=400)
 
 st.download_button(
     label="Download Filtered Data as CSV",
-    data=filtered_df.to_csv(index=False),
+    data=to_csv_bytes(filtered_df, data_id, key),
     file_name=f"zara_filtered_sales_{pd.Timestamp.now().strftime('%Y%m%d')}.csv",
     mime="text/csv"
 )
@@ -1,9 +1,16 @@
 # app.py
+from concurrent.futures import ThreadPoolExecutor
+
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
 from io import StringIO
 
+from charts import merge_bar_traces, show_table_page
+from data import load_zara, to_csv_bytes
+from filters import filter_frame, filter_options, make_filter_key
+
 
 # -------------------------- Page Config --------------------------
 st.set_page_config(
@@ -16,56 +23,37 @@ st.title("Zara Jackets Performance Dashboard")
 st.markdown("### Interactive analysis of Seasonal • Season • Material • Origin • Sales Volume")
 
 # -------------------------- Data Loading --------------------------
-# Try to load the real dataset first (works locally + when deployed with the file)
-try:
-    # This works when salesdata.csv is in the same folder
-    df = pd.read_csv("./Business_sales_EDA.csv", sep=None, engine="python")
-    data_source = "./Business_sales_EDA.csv"
-except FileNotFoundError:
-    # Fallback: let user upload the file (useful when testing online without the CSV yet)
-    st.warning("salesdata.csv not found in project folder → please upload it below")
-    uploaded = st.file_uploader("./Business_sales_EDA.csv", type=["csv"])
-    if uploaded is not None:
-        df = pd.read_csv(uploaded, sep=None, engine="python")
-        data_source = "uploaded file"
-    else:
-        st.info("Waiting for salesdata.csv upload...")
-        st.stop()
-else:
-    st.success(f"Loaded {len(df):,} rows from {data_source}")
-
-# -------------------------- Data Cleaning --------------------------
-df['Sales Volume'] = pd.to_numeric(df['Sales Volume'], errors='coerce')
-df['price'] = pd.to_numeric(df['price'], errors='coerce')
-
-# Optional: compute revenue for extra insights
-df['Revenue'] = df['price'] * df['Sales Volume']
+df, data_id = load_zara()
+
+FILTER_COLS = ['Seasonal', 'season', 'material', 'origin']
 
 # -------------------------- Sidebar Filters --------------------------
 st.sidebar.header("Filters")
 
+opts = filter_options(df, data_id, tuple(FILTER_COLS))
+
 seasonal_filter = st.sidebar.multiselect(
     "Seasonal Collection", 
-    options=sorted(df['Seasonal'].dropna().unique()),
-    default=df['Seasonal'].dropna().unique()
+    options=opts['Seasonal'],
+    default=opts['Seasonal']
 )
 
 season_filter = st.sidebar.multiselect(
     "Season", 
-    options=sorted(df['season'].dropna().unique()),
-    default=df['season'].dropna().unique()
+    options=opts['season'],
+    default=opts['season']
 )
 
 material_filter = st.sidebar.multiselect(
     "Material", 
-    options=sorted(df['material'].dropna().unique()),
-    default=df['material'].dropna().unique()
+    options=opts['material'],
+    default=opts['material']
 )
 
 origin_filter = st.sidebar.multiselect(
     "Country of Origin", 
-    options=sorted(df['origin'].dropna().unique()),
-    default=df['origin'].dropna().unique()
+    options=opts['origin'],
+    default=opts['origin']
 )
 
 # Price range filter (optional but very useful)
@@ -77,13 +65,9 @@ price_range = st.sidebar.slider(
 )
 
 # Apply all filters
-data = df[
-    (df['Seasonal'].isin(seasonal_filter)) &
-    (df['season'].isin(season_filter)) &
-    (df['material'].isin(material_filter)) &
-    (df['origin'].isin(origin_filter)) &
-    (df['price'].between(price_range[0], price_range[1]))
-].copy()
+selections = {'Seasonal': seasonal_filter, 'season': season_filter,
+              'material': material_filter, 'origin': origin_filter}
+data = filter_frame(df, selections, price_range)
 
 # -------------------------- Key Metrics --------------------------
 col1, col2, col3, col4 = st.columns(4)
@@ -98,24 +82,59 @@ with col4:
 
 st.markdown("---")
 
+# -------------------------- Aggregations --------------------------
+# Identical sidebar selections replay cached aggregates
+key = make_filter_key(selections, price_range)
+
+season_order = ['Spring', 'Summer', 'Autumn', 'Winter']
+
+
+def grouped_totals(frame):
+    """Seasonal, season x material and origin totals from one grouped pass."""
+    agg = frame.groupby(['Seasonal', 'season', 'material', 'origin'], observed=True)['Sales Volume'].sum()
+
+    season_mat = agg.groupby(level=['season', 'material'], observed=True).sum().reset_index()
+    # Seasons outside the calendar order (e.g. the loader's "Unknown" fill) go last
+    # rather than becoming NaN, which px.treemap rejects as a parent
+    extra = sorted(set(season_mat['season'].astype(str)) - set(season_order))
+    season_mat['season'] = pd.Categorical(season_mat['season'].astype(str),
+                                          categories=season_order + extra, ordered=True)
+
+    return {
+        'seasonal_sales': agg.groupby(level='Seasonal', observed=True).sum().reset_index(),
+        'season_mat': season_mat.sort_values('season'),
+        'origin_sales': agg.groupby(level='origin', observed=True).sum().sort_values(ascending=False).reset_index(),
+    }
+
+
+# Cached per (data_id, filter_key); _data itself is not hashed
+@st.cache_data(show_spinner=False, max_entries=32)
+def compute_aggregates(_data, data_id: str, filter_key: tuple) -> dict:
+    # The grouped pass and the top-20 selection are independent, and pandas
+    # releases the GIL inside its kernels, so run them side by side
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        totals = ex.submit(grouped_totals, _data)
+        top20 = ex.submit(_data.nlargest, 20, 'Sales Volume')
+    return {**totals.result(), 'top20': top20.result()}
+
+
+aggregates = compute_aggregates(data, data_id, key)
+
 # -------------------------- GRAPH 1: Seasonal vs Non-Seasonal --------------------------
 st.subheader("1. Do Seasonal Collections Actually Sell More?")
-seasonal_sales = data.groupby('Seasonal')['Sales Volume'].sum().reset_index()
+seasonal_sales = aggregates['seasonal_sales']
 fig1 = px.bar(seasonal_sales, x='Seasonal', y='Sales Volume',
               color='Seasonal', text='Sales Volume',
               color_discrete_map={'Yes': '#FF6B6B', 'No': '#1A936F'},
               title="Sales Volume: Seasonal vs Regular Items")
+fig1 = merge_bar_traces(fig1)
 fig1.update_traces(textposition='outside')
 fig1.update_layout(showlegend=False)
 st.plotly_chart(fig1, use_container_width=True)
 
 # -------------------------- GRAPH 2: Season × Material Treemap --------------------------
 st.subheader("2. Which Materials Win Each Season?")
-season_mat = data.groupby(['season', 'material'])['Sales Volume'].sum().reset_index()
-
-season_order = ['Spring', 'Summer', 'Autumn', 'Winter']
-season_mat['season'] = pd.Categorical(season_mat['season'], categories=season_order, ordered=True)
-season_mat = season_mat.sort_values('season')
+season_mat = aggregates['season_mat']
 
 fig2 = px.treemap(season_mat,
                   path=['season', 'material'],
@@ -127,7 +146,7 @@ st.plotly_chart(fig2, use_container_width=True)
 
 # -------------------------- GRAPH 3: Top 20 Best Sellers --------------------------
 st.subheader("3. Top 20 Best-Selling Jackets")
-top20 = data.nlargest(20, 'Sales Volume')
+top20 = aggregates['top20']
 
 fig3 = px.bar(top20, y='name', x='Sales Volume',
               color='season',
@@ -141,10 +160,11 @@ st.plotly_chart(fig3, use_container_width=True)
 
 # -------------------------- GRAPH 4: Origin Country Performance --------------------------
 st.subheader("4. Which Countries Produce the Best Sellers?")
-origin_sales = data.groupby('origin')['Sales Volume'].sum().sort_values(ascending=False).reset_index()
+origin_sales = aggregates['origin_sales']
 fig4 = px.bar(origin_sales, x='origin', y='Sales Volume',
               color='origin', text='Sales Volume',
               title="Sales Volume by Country of Origin")
+fig4 = merge_bar_traces(fig4)
 fig4.update_traces(textposition='outside')
 st.plotly_chart(fig4, use_container_width=True)
 
@@ -152,16 +172,15 @@ st.plotly_chart(fig4, use_container_width=True)
 st.markdown("---")
 st.subheader("Filtered Data Table")
 display_cols = ['name', 'Sales Volume', 'Revenue', 'price', 'season', 'material', 'origin', 'Seasonal', 'section']
-st.dataframe(
-    data[display_cols].sort_values('Sales Volume', ascending=False).reset_index(drop=True),
-    use_container_width=True
-)
+# Sorted by Sales Volume via an argsort of that one column, so only the visible page
+# of the frame is ever reordered; the download below has every row
+order = np.argsort(-data['Sales Volume'].values, kind='stable')
+show_table_page(data, columns=display_cols, order=order, use_container_width=True)
 
 # -------------------------- Download Filtered Data --------------------------
-csv = data.to_csv(index=False, sep=',')
 st.download_button(
     label="Download filtered data as CSV",
-    data=csv,
+    data=to_csv_bytes(data, data_id, key),
     file_name="zara_filtered_sales.csv",
     mime="text/csv"
 )
@@ -0,0 +1,54 @@
+# charts.py - Plotly & table display helpers shared by the Zara dashboards (app.py, app2.py)
+import plotly.graph_objects as go
+import streamlit as st
+
+
+def merge_bar_traces(fig):
+    """Collapse px's one-trace-per-color bars into a single trace with per-bar colors.
+
+    Only for charts whose color just repeats the x category, so no legend is
+    needed: the browser then lays out one trace instead of one per category.
+    """
+    bars = [t for t in fig.data if t.type == 'bar']
+    if len(bars) <= 1:
+        return fig
+
+    x, y, text, colors = [], [], [], []
+    for trace in bars:
+        n = len(trace.x)
+        x.extend(trace.x)
+        y.extend(trace.y)
+        text.extend(trace.text if trace.text is not None else [None] * n)
+        colors.extend([trace.marker.color] * n)
+
+    # The per-trace hovertemplates hard-code their own color value, so rebuild a generic one
+    x_title = fig.layout.xaxis.title.text or 'x'
+    y_title = fig.layout.yaxis.title.text or 'y'
+    fig.data = [t for t in fig.data if t.type != 'bar']
+    fig.add_trace(go.Bar(
+        x=x, y=y, text=text,
+        marker_color=colors,
+        showlegend=False,
+        hovertemplate=f"{x_title}=%{{x}}<br>{y_title}=%{{y}}<extra></extra>",
+    ))
+    fig.update_layout(showlegend=False)
+    return fig
+
+
+PAGE_SIZE = 500
+
+
+def show_table_page(frame, columns=None, order=None, **dataframe_kwargs):
+    """Render one PAGE_SIZE page of `frame` with a page picker above it.
+
+    `order` is an optional row-position permutation (e.g. an argsort) and `columns`
+    an optional projection; both are applied to the visible page only, so the rest
+    of the frame is never materialized or shipped to the browser.
+    """
+    n_pages = max(1, -(-len(frame) // PAGE_SIZE))
+    page = st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1, step=1)
+    rows = slice((page - 1) * PAGE_SIZE, page * PAGE_SIZE)
+    page_df = frame.iloc[rows] if order is None else frame.iloc[order[rows]]
+    if columns is not None:
+        page_df = page_df[columns]
+    st.dataframe(page_df, **dataframe_kwargs)
@@ -0,0 +1,189 @@
+# data.py - Shared loading & cleaning for the Zara dashboards (app.py, app2.py)
+import csv
+import hashlib
+import os
+import streamlit as st
+import pandas as pd
+from io import BytesIO
+
+DATA_PATH = "./Business_sales_EDA.csv"
+
+# -------------------------- Data Cleaning --------------------------
+# Known aliases for the columns the dashboards use (matched case-insensitively)
+COL_MAP = {
+    'product_name': 'name',
+    'productname': 'name',
+    'item': 'name',
+    'price': 'price',
+    'sales_volume': 'Sales Volume',
+    'salesvolume': 'Sales Volume',
+    'units_sold': 'Sales Volume',
+    'unitssold': 'Sales Volume',
+    'quantity': 'Sales Volume',
+    'revenue': 'Revenue',
+    'promotion': 'Promotion',
+    'product_position': 'Product Position',
+    'position': 'Product Position',
+    'seasonal': 'Seasonal',
+    'section': 'section',
+    'gender': 'section',
+    'season': 'season',
+    'material': 'material',
+    'fabric': 'material'
+}
+
+# Only the columns the dashboards read, plus Product ID so exported rows can be traced
+# back to a product; everything else (url, description, ...) is skipped at parse time
+USE_COLS = ['Product ID', 'name', 'price', 'Sales Volume', 'Promotion', 'Product Position',
+            'Seasonal', 'section', 'season', 'material', 'origin']
+CATEGORY_COLS = ['Promotion', 'Product Position', 'Seasonal', 'section', 'season', 'material', 'origin']
+_KEEP_COLS = {c.lower() for c in USE_COLS} | set(COL_MAP) | {'sales', 'units'}
+
+# Dictionary-encode the low-cardinality filter columns at parse time. Numerics are
+# narrowed in clean_data instead, after coercion - a strict dtype here would make
+# read_csv raise on a blank or "$78.99" cell rather than dropping that row.
+DTYPES = {
+    'Promotion': 'category',
+    'Product Position': 'category',
+    'Seasonal': 'category',
+    'section': 'category',
+    'season': 'category',
+    'material': 'category',
+    'origin': 'category',
+}
+
+
+def clean_data(df):
+    """Standardize columns, coerce numerics, compute Revenue and fill categoricals."""
+    # Standardize common column names (case-insensitive match)
+    df.columns = df.columns.str.strip()
+    for old, new in COL_MAP.items():
+        for col in df.columns:
+            if col.lower() == old:
+                df.rename(columns={col: new}, inplace=True)
+
+    # Convert price and sales volume
+    df['price'] = pd.to_numeric(df['price'], errors='coerce')
+    if 'Sales Volume' not in df.columns:
+        possible_sales_cols = ['units_sold', 'quantity', 'sales_volume', 'sales', 'units']
+        for col in possible_sales_cols:
+            if col in df.columns.str.lower():
+                df['Sales Volume'] = pd.to_numeric(df[df.columns[df.columns.str.lower() == col].iloc[0]], errors='coerce')
+                break
+
+    df['Sales Volume'] = pd.to_numeric(df.get('Sales Volume', 0), errors='coerce')
+
+    # Drop rows with no price or sales (critical)
+    df.dropna(subset=['price', 'Sales Volume'], inplace=True)
+
+    # Calculate Revenue
+    # Kept in float64: the metrics print whole-dollar totals, and float32 rows (or a
+    # float32 price) shift those totals by several dollars
+    df['Revenue'] = df['price'] * df['Sales Volume']
+
+    # Narrow Sales Volume only now that Revenue has been derived from the coerced values.
+    # price stays float64: float32 prices leak into the hover labels as 18.989999771118164.
+    df['Sales Volume'] = pd.to_numeric(df['Sales Volume'], downcast='integer')
+
+    # Fill missing categorical values
+    cat_cols = CATEGORY_COLS + ['name']
+    for col in cat_cols:
+        if col in df.columns and isinstance(df[col].dtype, pd.CategoricalDtype):
+            if df[col].isna().any():
+                if "Unknown" not in df[col].cat.categories:
+                    df[col] = df[col].cat.add_categories("Unknown")
+                df[col] = df[col].fillna("Unknown")
+        elif col in df.columns:
+            df[col] = df[col].fillna("Unknown").astype(str)
+        else:
+            df[col] = "Unknown"
+
+    # Ensure 'name' exists
+    if 'name' not in df.columns:
+        df['name'] = df.get('product_name', 'Product ' + df.index.astype(str))
+
+    # Filter columns are masked on every rerun, so keep them dictionary-encoded. The
+    # parse-time categories predate the dropna above, so prune levels with no rows left
+    # (the sidebar options are built straight from cat.categories).
+    for col in CATEGORY_COLS:
+        df[col] = df[col].astype('category').cat.remove_unused_categories()
+
+    return df
+
+
+# -------------------------- Data Loading --------------------------
+def _use_col(col):
+    return col.strip().lower() in _KEEP_COLS
+
+
+def read_sales_csv(source):
+    """Sniff the delimiter from the first 4 KB, then parse with the fast C engine."""
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            head = f.read(4096)
+    else:
+        head = source.read(4096)
+        source.seek(0)
+    try:
+        sep = csv.Sniffer().sniff(head.decode("utf-8", "ignore"), delimiters=",\t;|").delimiter
+    except csv.Error:
+        # Sniffer couldn't decide - fall back to pandas' (slow) python-engine detection
+        return pd.read_csv(source, sep=None, engine="python", usecols=_use_col, dtype=DTYPES)
+    return pd.read_csv(source, sep=sep, engine="c", usecols=_use_col, dtype=DTYPES)
+
+
+# Streamlit reruns the whole script on every widget interaction, so parse + clean
+# once and replay the cleaned frame from cache. mtime is only part of the cache key
+# so that editing the CSV on disk invalidates it.
+# cache_resource hands back the same in-memory frame instead of unpickling a copy
+# per rerun, so everything downstream must treat df as read-only. cache_resource
+# never evicts on its own, so only the current file version / last few uploads are kept.
+@st.cache_resource(show_spinner=False, max_entries=1)
+def load_data(path: str, mtime: float) -> pd.DataFrame:
+    return clean_data(read_sales_csv(path))
+
+
+# Keyed on the upload's sha1 (computed once in load_zara); the bytes themselves are
+# passed unhashed so Streamlit doesn't hash the whole file a second time per rerun
+@st.cache_resource(show_spinner=False, max_entries=2)
+def load_uploaded(digest: str, _data: bytes) -> pd.DataFrame:
+    return clean_data(read_sales_csv(BytesIO(_data)))
+
+
+def load_zara():
+    """Load the cleaned dataset, falling back to an upload; returns (df, data_id).
+
+    data_id fingerprints the data version (path+mtime or upload hash) for keying
+    downstream caches. The returned frame is a shared cache_resource singleton -
+    treat it as read-only.
+    """
+    # Try to load the real dataset first (works locally + when deployed with the file)
+    try:
+        # This works when salesdata.csv is in the same folder
+        mtime = os.path.getmtime(DATA_PATH)
+        df = load_data(DATA_PATH, mtime)
+        data_source = DATA_PATH
+        data_id = f"{DATA_PATH}@{mtime}"
+    except FileNotFoundError:
+        # Fallback: let user upload the file (useful when testing online without the CSV yet)
+        st.warning("salesdata.csv not found in project folder → please upload it below")
+        uploaded = st.file_uploader(DATA_PATH, type=["csv"])
+        if uploaded is not None:
+            raw = uploaded.getvalue()
+            data_id = hashlib.sha1(raw).hexdigest()
+            df = load_uploaded(data_id, _data=raw)
+            data_source = "uploaded file"
+        else:
+            st.info("Waiting for salesdata.csv upload...")
+            st.stop()
+    else:
+        st.success(f"Loaded {len(df):,} rows from {data_source}")
+    return df, data_id
+
+
+# Serialize once per filter selection rather than on every rerun; the bytes are
+# only needed when the download button is actually clicked. Every slider position
+# is a new key, so keep just the last couple of selections.
+@st.cache_data(show_spinner=False, max_entries=2)
+def to_csv_bytes(_frame, data_id: str, filter_key: tuple) -> bytes:
+    return _frame.to_csv(index=False).encode()
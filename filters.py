@@ -0,0 +1,43 @@
+# filters.py - Sidebar filter helpers shared by the Zara dashboards (app.py, app2.py)
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+
+# Get unique values safely
+def get_unique(df, col):
+    if isinstance(df[col].dtype, pd.CategoricalDtype):
+        # Categories are already deduplicated; only the k levels get sorted
+        return np.sort(df[col].cat.categories.values).tolist()
+    values = pd.unique(df[col].dropna().values)
+    return np.sort(values).tolist()
+
+
+# Options only change with the data, so build them once per dataset version
+# (data_id) rather than rescanning every column on each rerun
+@st.cache_data(show_spinner=False)
+def filter_options(_df, data_id: str, cols: tuple) -> dict:
+    return {col: get_unique(_df, col) for col in cols}
+
+
+def isin_codes(df, col, selected):
+    """Mask rows whose category is in `selected`, comparing int codes rather than strings."""
+    codes = df[col].cat.categories.get_indexer(selected)
+    return np.isin(df[col].cat.codes.values, codes[codes >= 0])
+
+
+def filter_frame(df, selections, price_range):
+    """Rows matching every {column: selected values} entry and the inclusive price range."""
+    # AND every predicate into one preallocated mask instead of chaining boolean Series
+    price = df['price'].values
+    mask = np.ones(len(df), dtype=bool)
+    for col, selected in selections.items():
+        np.logical_and(mask, isin_codes(df, col, selected), out=mask)
+    np.logical_and(mask, price >= price_range[0], out=mask)
+    np.logical_and(mask, price <= price_range[1], out=mask)
+    return df.iloc[np.flatnonzero(mask)]
+
+
+def make_filter_key(selections, price_range):
+    """Hashable snapshot of the sidebar state, for keying per-selection caches."""
+    return tuple((col, tuple(sorted(selected))) for col, selected in selections.items()) + (tuple(price_range),)